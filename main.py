@@ -10,10 +10,16 @@ Usage examples:
 
 import argparse
 import sys
-import json
 from pathlib import Path
-from smart_qa.client import LLMClient
-from smart_qa.custom_exceptions import LLMAPIError
+from typing import TYPE_CHECKING, Optional
+
+# smart_qa (and the Gemini SDK behind it) is imported inside the handlers,
+# so --help and --clear-cache never pay for it
+if TYPE_CHECKING:
+    from smart_qa.client import LLMClient
+
+# 128 KiB instead of the 8 KiB default, for large --save outputs
+WRITE_BUFFER_SIZE = 1 << 17
 
 
 def read_file(file_path: str) -> str:
@@ -32,23 +38,19 @@ def read_file(file_path: str) -> str:
     - Modern Python best practice
     """
     try:
-        path = Path(file_path)
-        if not path.exists():
-            print(f"❌ Error: File '{file_path}' not found")
-            sys.exit(1)
-        
-        with open(path, 'r', encoding='utf-8') as f:
-            content = f.read()
-        
-        if not content.strip():
-            print(f"❌ Error: File '{file_path}' is empty")
-            sys.exit(1)
-            
-        return content
-    
+        content = Path(file_path).read_text(encoding='utf-8')
+    except FileNotFoundError:
+        print(f"❌ Error: File '{file_path}' not found")
+        sys.exit(1)
     except Exception as e:
         print(f"❌ Error reading file: {e}")
         sys.exit(1)
+    
+    if not content or content.isspace():
+        print(f"❌ Error: File '{file_path}' is empty")
+        sys.exit(1)
+    
+    return content
 
 
 def write_file(file_path: str, content: str) -> None:
@@ -65,7 +67,7 @@ def write_file(file_path: str, content: str) -> None:
         # Create parent directories if they don't exist
         path.parent.mkdir(parents=True, exist_ok=True)
         
-        with open(path, 'w', encoding='utf-8') as f:
+        with open(path, 'w', encoding='utf-8', buffering=WRITE_BUFFER_SIZE) as f:
             f.write(content)
         
         print(f"✅ Saved to: {file_path}")
@@ -75,7 +77,7 @@ def write_file(file_path: str, content: str) -> None:
         sys.exit(1)
 
 
-def handle_summarize(args, client: LLMClient) -> None:
+def handle_summarize(args, client: "LLMClient") -> None:
     """
     Handle the 'summarize' command.
     
@@ -84,6 +86,8 @@ def handle_summarize(args, client: LLMClient) -> None:
     2. Call client.summarize()
     3. Print or save result
     """
+    from smart_qa.custom_exceptions import LLMAPIError
+    
     print("📝 Summarizing text...\n")
     
     # Get input text
@@ -116,7 +120,7 @@ def handle_summarize(args, client: LLMClient) -> None:
         sys.exit(1)
 
 
-def handle_ask(args, client: LLMClient) -> None:
+def handle_ask(args, client: "LLMClient") -> None:
     """
     Handle the 'ask' command.
     
@@ -124,6 +128,8 @@ def handle_ask(args, client: LLMClient) -> None:
     - Context (from --file or stdin)
     - Question (from --question)
     """
+    from smart_qa.custom_exceptions import LLMAPIError
+    
     print("❓ Answering question...\n")
     
     # Get context
@@ -162,12 +168,15 @@ def handle_ask(args, client: LLMClient) -> None:
         sys.exit(1)
 
 
-def handle_extract(args, client: LLMClient) -> None:
+def handle_extract(args, client: "LLMClient") -> None:
     """
     Handle the 'extract' command.
     
     Extracts entities and returns structured JSON.
     """
+    import json
+    from smart_qa.custom_exceptions import LLMAPIError
+    
     print("🔍 Extracting entities...\n")
     
     # Get input text
@@ -182,17 +191,15 @@ def handle_extract(args, client: LLMClient) -> None:
         entities = client.extract_entities(text)
         
         # Pretty print JSON
-        json_output = json.dumps(entities, indent=2)
-        
         print("\n" + "="*60)
         print("EXTRACTED ENTITIES:")
         print("="*60)
-        print(json_output)
+        print(json.dumps(entities, indent=2))
         print("="*60 + "\n")
         
-        # Save if requested
+        # Save if requested (compact - the file is for machines, not eyes)
         if args.save:
-            write_file(args.save, json_output)
+            write_file(args.save, json.dumps(entities, separators=(',', ':')))
     
     except LLMAPIError as e:
         print(f"❌ API Error: {e}")
@@ -202,6 +209,74 @@ def handle_extract(args, client: LLMClient) -> None:
         sys.exit(1)
 
 
+def _build_summarize(summarize_parser) -> None:
+    """Add the 'summarize' command arguments."""
+    summarize_parser.add_argument(
+        '--file',
+        type=str,
+        help='Path to text file to summarize'
+    )
+    summarize_parser.add_argument(
+        '--save',
+        type=str,
+        help='Save summary to file'
+    )
+
+
+def _build_ask(ask_parser) -> None:
+    """Add the 'ask' command arguments."""
+    ask_parser.add_argument(
+        '--file',
+        type=str,
+        help='Path to context file'
+    )
+    ask_parser.add_argument(
+        '--question',
+        type=str,
+        required=True,  # Must provide a question
+        help='Question to ask'
+    )
+    ask_parser.add_argument(
+        '--save',
+        type=str,
+        help='Save answer to file'
+    )
+
+
+def _build_extract(extract_parser) -> None:
+    """Add the 'extract' command arguments."""
+    extract_parser.add_argument(
+        '--file',
+        type=str,
+        help='Path to text file'
+    )
+    extract_parser.add_argument(
+        '--save',
+        type=str,
+        help='Save extracted entities to JSON file'
+    )
+
+
+# Command name -> (argument builder, help text)
+COMMANDS = {
+    'summarize': (_build_summarize, 'Summarize text'),
+    'ask': (_build_ask, 'Ask a question about text'),
+    'extract': (_build_extract, 'Extract entities from text'),
+}
+
+
+def _sniff_subcommand(argv) -> Optional[str]:
+    """
+    Return the first command name found in argv (or None).
+    
+    Lets main() skip building parsers for commands that aren't being run.
+    """
+    for token in argv:
+        if token in COMMANDS:
+            return token
+    return None
+
+
 def main():
     """
     Main entry point for the CLI.
@@ -245,59 +320,14 @@ Examples:
         help='Available commands'
     )
     
-    # --- SUMMARIZE command ---
-    summarize_parser = subparsers.add_parser(
-        'summarize',
-        help='Summarize text'
-    )
-    summarize_parser.add_argument(
-        '--file',
-        type=str,
-        help='Path to text file to summarize'
-    )
-    summarize_parser.add_argument(
-        '--save',
-        type=str,
-        help='Save summary to file'
-    )
-    
-    # --- ASK command ---
-    ask_parser = subparsers.add_parser(
-        'ask',
-        help='Ask a question about text'
-    )
-    ask_parser.add_argument(
-        '--file',
-        type=str,
-        help='Path to context file'
-    )
-    ask_parser.add_argument(
-        '--question',
-        type=str,
-        required=True,  # Must provide a question
-        help='Question to ask'
-    )
-    ask_parser.add_argument(
-        '--save',
-        type=str,
-        help='Save answer to file'
-    )
-    
-    # --- EXTRACT command ---
-    extract_parser = subparsers.add_parser(
-        'extract',
-        help='Extract entities from text'
-    )
-    extract_parser.add_argument(
-        '--file',
-        type=str,
-        help='Path to text file'
-    )
-    extract_parser.add_argument(
-        '--save',
-        type=str,
-        help='Save extracted entities to JSON file'
-    )
+    # Only build the full parser for the command actually being run;
+    # the others are registered by name so they still show up in --help
+    chosen = _sniff_subcommand(sys.argv[1:])
+    for name, (build, help_text) in COMMANDS.items():
+        if name == chosen:
+            build(subparsers.add_parser(name, help=help_text))
+        else:
+            subparsers.add_parser(name, help=help_text, add_help=False)
     
     # Parse arguments
     args = parser.parse_args()
@@ -307,23 +337,31 @@ Examples:
         parser.print_help()
         sys.exit(0)
     
+    # --clear-cache on its own never talks to the API, so skip building a
+    # client (dotenv, genai.configure, cache load) and just truncate the log
+    if args.clear_cache and not args.command:
+        print("🧹 Clearing cache...")
+        from smart_qa.constants import CACHE_FILENAME, DEFAULT_CACHE_DIR
+        cache_file = Path(DEFAULT_CACHE_DIR) / CACHE_FILENAME
+        cache_file.parent.mkdir(exist_ok=True)
+        cache_file.write_text('')
+        print("✅ Cache cleared!\n")
+        sys.exit(0)
+    
     # Initialize client
     try:
         print("🚀 Initializing Smart Q&A Client...\n")
+        from smart_qa.client import LLMClient
         client = LLMClient()
     except Exception as e:
         print(f"❌ Failed to initialize client: {e}")
         sys.exit(1)
     
-    # Handle --clear-cache flag
+    # Handle --clear-cache alongside a command
     if args.clear_cache:
         print("🧹 Clearing cache...")
         client.clear_cache()
         print("✅ Cache cleared!\n")
-        
-        # If only clearing cache, exit here
-        if not args.command:
-            sys.exit(0)
     
     # Route to appropriate handler
     if args.command == 'summarize':
@@ -1,13 +1,21 @@
 import os
+import copy
 import json
 import logging
 import functools
+import random
+import re
 import time
+from hashlib import blake2b
 from pathlib import Path
 from typing import Dict, Any
-import google.generativeai as genai
-from dotenv import load_dotenv
-from .custom_exceptions import LLMAPIError
+from .constants import CACHE_FILENAME, DEFAULT_CACHE_DIR
+from .custom_exceptions import LLMAPIError, PermanentLLMError
+
+try:
+    import orjson  # optional, faster JSON encoding/decoding
+except ImportError:
+    orjson = None
 
 # Configure logging (helps you debug and track what's happening)
 logging.basicConfig(
@@ -16,15 +24,80 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# The Gemini SDK is slow to import (grpc, protobuf, google.auth), so it is
+# imported on first LLMClient() instead of at module load. Tests patch this name.
+genai = None
+
+# Set once load_dotenv() has run (see LLMClient.__init__)
+_DOTENV_LOADED = False
+
+MODEL_NAME = "gemini-2.5-flash"
+
+PROMPT_SUMMARIZE = "Provide a concise summary of the following text:\n\n{text}"
+
+# Restricts the model to the given context
+PROMPT_ASK = """Based ONLY on the following context, answer the question.
+If the answer is not in the context, say "I cannot answer based on the provided context."
+
+Context:
+{context}
+
+Question: {question}
+
+Answer:"""
+
+PROMPT_EXTRACT = """Extract the following entities from the text and return ONLY a JSON object:
+- people: list of person names
+- dates: list of dates mentioned
+- locations: list of locations
+
+Text:
+{text}
+
+Return ONLY valid JSON, no markdown formatting."""
+
+# Markdown code fence around a JSON reply, e.g. ```json {...} ``` or ~~~ {...} ~~~
+# (closing fence optional, in case the model output was cut off)
+_FENCE_RE = re.compile(r'^\s*(```|~~~)(?:json)?\s*(.*?)\s*(?:\1\s*)?$', re.S)
+
+# Upper bound (seconds) on the backoff between API retries
+MAX_RETRY_WAIT = 10
+
+# Max entries kept in each client's in-memory memo (see _cached_call)
+MEM_CACHE_SIZE = 128
+
+
+def _dumps(obj: Any) -> bytes:
+    """Serialize to compact UTF-8 JSON bytes (orjson when installed)."""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+
+def _loads(data) -> Any:
+    """Parse JSON from str or bytes (orjson when installed)."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
 class LLMClient:
     """
     A professional LLM client with caching and error handling.
     
     """
     
-    def __init__(self, cache_dir: str = ".cache") -> None:
+    def __init__(self, cache_dir: str = DEFAULT_CACHE_DIR) -> None:
         """Initialize the LLM client."""
-        load_dotenv()
+        global genai, _DOTENV_LOADED
+        if genai is None:
+            import google.generativeai as genai
+
+        # .env only needs reading once per process, not per client
+        if not _DOTENV_LOADED:
+            from dotenv import load_dotenv
+            load_dotenv()
+            _DOTENV_LOADED = True
     
         api_key = os.getenv("GOOGLE_API_KEY")
         if not api_key:
@@ -36,36 +109,22 @@ class LLMClient:
         
         genai.configure(api_key=api_key)
         
-        # Try these models in order (v0.8.5 format)
-        model_attempts = [
-            'gemini-2.5-flash-latest',
-            'gemini-1.5-pro-latest', 
-            'gemini-pro',
-            'gemini-1.5-flash',
-            'gemini-1.5-pro'
-        ]
-        
-        last_error = None
-        for model_name in model_attempts:
-            try:
-                self.model = genai.GenerativeModel("gemini-2.5-flash")
-                # Test it works
-                logger.info(f"✓ Successfully loaded model: {"gemini-2.5-flash"}")
-                break
-            except Exception as e:
-                last_error = e
-                logger.debug(f"Failed to load {"gemini-2.5-flash"}: {e}")
-                continue
-        else:
-            # No model worked
-            raise ValueError(f"Could not initialize any model. Last error: {last_error}")
+        try:
+            self.model = genai.GenerativeModel(MODEL_NAME)
+            logger.info(f"✓ Successfully loaded model: {MODEL_NAME}")
+        except Exception as e:
+            raise ValueError(f"Could not initialize model {MODEL_NAME}: {e}")
         
         # Set up caching
         self.cache_dir = Path(cache_dir)
         self.cache_dir.mkdir(exist_ok=True)
-        self.cache_file = self.cache_dir / "llm_cache.json"
+        self.cache_file = self.cache_dir / CACHE_FILENAME
+        
+        # Loaded on first _cached_call so --help/validation errors never read it
+        self.cache = None
         
-        self._load_cache()
+        # (method, args) -> result for calls already made in this process
+        self._mem_cache: Dict[tuple, Any] = {}
         
         logger.info("LLMClient initialized successfully")
     
@@ -73,37 +132,65 @@ class LLMClient:
         """
         Load cache from disk (private method, indicated by leading underscore).
 
+        The cache file is an append-only log with one {key: value} object
+        per line; later lines win. A truncated line (e.g. from a crash
+        mid-write) is skipped, and the log is compacted if it has any
+        duplicate or broken lines.
         """
+        self.cache = {}
         try:
-            if self.cache_file.exists():
-                with open(self.cache_file, 'r') as f:
-                    self.cache = json.load(f)
-                logger.info(f"Loaded {len(self.cache)} cached entries")
-            else:
-                self.cache = {}
-        except json.JSONDecodeError:
-            logger.warning("Cache file corrupted, starting fresh")
-            self.cache = {}
+            data = self.cache_file.read_bytes()
+        except FileNotFoundError:
+            return
+
+        lines = 0
+        for line in data.splitlines():
+            if not line.strip():
+                continue
+            lines += 1
+            try:
+                self.cache.update(_loads(line))
+            except (ValueError, TypeError):
+                logger.warning("Skipping corrupted cache entry")
+        logger.info(f"Loaded {len(self.cache)} cached entries")
+
+        if lines > len(self.cache):
+            self._save_cache()
     
     def _save_cache(self) -> None:
-        """Save cache to disk (persists between program runs)."""
-        with open(self.cache_file, 'w') as f:
-            json.dump(self.cache, f, indent=2)
+        """Rewrite the whole cache log (used for compaction and clearing)."""
+        # Write a temp file and rename it over the log so a crash mid-write
+        # never leaves a half-written cache behind
+        tmp = self.cache_file.with_suffix('.jsonl.tmp')
+        with open(tmp, 'wb') as f:
+            for key, value in self.cache.items():
+                f.write(_dumps({key: value}) + b"\n")
+        os.replace(tmp, self.cache_file)
+    
+    def _append_cache(self, key: str, value: Any) -> None:
+        """Persist a single new entry without rewriting the whole file."""
+        with open(self.cache_file, 'ab') as f:
+            f.write(_dumps({key: value}) + b"\n")
     
     def _get_cache_key(self, method: str, *args) -> str:
         """
         Create a unique key for caching.
         
         """
-        # Create a string representation of the arguments
-        args_str = json.dumps(args, sort_keys=True)
-        
-        # Combine method name and arguments
-        key_content = f"{method}:{args_str}"
+        if all(isinstance(arg, str) for arg in args):
+            # Common case: join the raw strings with NUL separators instead
+            # of paying for a json.dumps of (possibly long) text
+            data = method.encode('utf-8') + b'\x00' + b'\x00'.join(
+                arg.encode('utf-8') for arg in args
+            )
+        else:
+            # Create a string representation of the arguments. Always stdlib
+            # json (not orjson), so keys don't depend on what's installed.
+            args_str = json.dumps(args, sort_keys=True)
+            data = f"{method}:{args_str}".encode('utf-8')
         
         # Use hash for shorter keys (optional but cleaner)
-        import hashlib
-        key_hash = hashlib.md5(key_content.encode()).hexdigest()
+        key_hash = blake2b(data, digest_size=16).hexdigest()
         
         return f"{method}:{key_hash}"
     
@@ -112,22 +199,43 @@ class LLMClient:
         Generic caching wrapper
         
         """
+        # Repeat calls in this process skip hashing entirely. Only all-str
+        # args are memoised; others (e.g. dicts) may be unhashable.
+        mem_key = None
+        if all(isinstance(arg, str) for arg in args):
+            mem_key = (method_name, args)
+            if mem_key in self._mem_cache:
+                logger.info(f"Cache HIT for {method_name}")
+                return self._mem_cache[mem_key]
+        
         cache_key = self._get_cache_key(method_name, *args)
         
+        if self.cache is None:
+            self._load_cache()
+        
         # Check cache first
         if cache_key in self.cache:
             logger.info(f"Cache HIT for {method_name}")
-            return self.cache[cache_key]
-        
-        # Cache miss - call the actual function
-        logger.info(f"Cache MISS for {method_name} - calling API")
-        result = func(*args)
-        
-        # Save to cache
-        self.cache[cache_key] = result
-        self._save_cache()
+            result = self.cache[cache_key]
+        else:
+            # Cache miss - call the actual function
+            logger.info(f"Cache MISS for {method_name} - calling API")
+            result = func(*args)
+            
+            # Save to cache
+            self.cache[cache_key] = result
+            self._append_cache(cache_key, result)
         
+        if mem_key is not None:
+            self._remember(mem_key, result)
         return result
+    
+    def _remember(self, mem_key: tuple, result: Any) -> None:
+        """Add to the in-memory memo, evicting the oldest entry when full."""
+        if len(self._mem_cache) >= MEM_CACHE_SIZE:
+            del self._mem_cache[next(iter(self._mem_cache))]
+        self._mem_cache[mem_key] = result
+    
     def _extract_text(response):
         """Safely extract text from Gemini responses."""
         # Newer Gemini responses
@@ -148,18 +256,23 @@ class LLMClient:
                     [prompt],  # request must be a list
                 )
 
-                # validate
+                # validate (retrying won't change the shape of the response)
                 if not response or not hasattr(response, "text"):
-                    raise LLMAPIError("Empty or invalid response from API")
+                    raise PermanentLLMError("Empty or invalid response from API")
 
                 return response.text
 
+            except PermanentLLMError:
+                raise
+
             except Exception as e:
                 if attempt < max_retries - 1:
-                    wait = 2 ** attempt
+                    # Capped exponential backoff with jitter so scripted runs
+                    # don't all retry in lockstep
+                    wait = min(2 ** attempt, MAX_RETRY_WAIT) + random.uniform(0, 0.5)
                     logger.warning(
                         f"API call failed (attempt {attempt+1}/{max_retries}). "
-                        f"Retrying in {wait}s... Error: {e}"
+                        f"Retrying in {wait:.1f}s... Error: {e}"
                     )
                     time.sleep(wait)
                 else:
@@ -179,13 +292,11 @@ class LLMClient:
             A concise summary
         """
         # Input validation
-        if not text or not text.strip():
+        if not text or text.isspace():
             raise ValueError("Text cannot be empty")
         
         # Define the actual API call as a lambda
-        api_call = lambda t: self._call_api_with_retry(
-            f"Provide a concise summary of the following text:\n\n{t}"
-        )
+        api_call = lambda t: self._call_api_with_retry(PROMPT_SUMMARIZE.format(text=t))
         
         # Use caching wrapper
         return self._cached_call("summarize", api_call, text)
@@ -202,24 +313,16 @@ class LLMClient:
             The answer based on the context
         """
         # Validate inputs
-        if not context or not context.strip():
+        if not context or context.isspace():
             raise ValueError("Context cannot be empty")
-        if not question or not question.strip():
+        if not question or question.isspace():
             raise ValueError("Question cannot be empty")
         
-        # Craft a prompt that restricts the model to the context
-        prompt = f"""Based ONLY on the following context, answer the question.
-If the answer is not in the context, say "I cannot answer based on the provided context."
-
-Context:
-{context}
-
-Question: {question}
-
-Answer:"""
-        
-        api_call = lambda p: self._call_api_with_retry(p)
-        return self._cached_call("ask", api_call, prompt)
+        # The prompt is only built on a cache MISS; the key is (context, question)
+        api_call = lambda c, q: self._call_api_with_retry(
+            PROMPT_ASK.format(context=c, question=q)
+        )
+        return self._cached_call("ask", api_call, context, question)
 
 
     
@@ -230,26 +333,16 @@ Answer:"""
         Returns:
             Dictionary with keys: "people", "dates", "locations"
         """
-        if not text or not text.strip():
+        if not text or text.isspace():
             raise ValueError("Text cannot be empty")
         
-        prompt = f"""Extract the following entities from the text and return ONLY a JSON object:
-- people: list of person names
-- dates: list of dates mentioned
-- locations: list of locations
-
-Text:
-{text}
-
-Return ONLY valid JSON, no markdown formatting."""
-        
-        api_call = lambda t: self._call_api_with_retry(prompt)
-        
-        # Get result (possibly from cache)
-        result = self._cached_call("extract_entities", api_call, text)
+        # Parse on the miss path so the cache holds the dict and HITs skip it
+        api_call = lambda t: self._parse_json_safely(
+            self._call_api_with_retry(PROMPT_EXTRACT.format(text=t))
+        )
         
-        # Parse JSON safely
-        return self._parse_json_safely(result)
+        # Copy so callers can mutate the result without touching the cache
+        return copy.deepcopy(self._cached_call("extract_entities", api_call, text))
     
     def _parse_json_safely(self, text: str) -> Dict[str, Any]:
         """
@@ -257,23 +350,17 @@ Return ONLY valid JSON, no markdown formatting."""
         
         """
         # Remove markdown code blocks
-        text = text.strip()
-        if text.startswith("```json"):
-            text = text[7:]  # Remove ```json
-        if text.startswith("```"):
-            text = text[3:]  # Remove ```
-        if text.endswith("```"):
-            text = text[:-3]  # Remove trailing ```
-        
-        text = text.strip()
+        match = _FENCE_RE.match(text)
+        text = match.group(2) if match else text.strip()
         
         try:
-            return json.loads(text)
-        except json.JSONDecodeError as e:
+            return _loads(text)
+        except json.JSONDecodeError as e:  # orjson.JSONDecodeError subclasses this
             raise LLMAPIError(f"Failed to parse JSON: {str(e)}")
     
     def clear_cache(self) -> None:
         """Clear all cached results."""
         self.cache = {}
+        self._mem_cache = {}
         self._save_cache()
         logger.info("Cache cleared")
\ No newline at end of file
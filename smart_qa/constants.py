@@ -0,0 +1,10 @@
+"""
+Shared settings that are cheap to import.
+
+Kept out of client.py so the CLI can reach the cache without loading the
+client (and the Gemini SDK behind it).
+"""
+
+# Where LLMClient keeps its on-disk cache by default
+DEFAULT_CACHE_DIR = ".cache"
+CACHE_FILENAME = "llm_cache.jsonl"
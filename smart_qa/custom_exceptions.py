@@ -11,4 +11,11 @@ class LLMAPIError(Exception):
     def __str__(self):
         if self.status_code:
             return f"LLMAPIError (Status {self.status_code}): {self.message}"
-        return f"LLMAPIError: {self.message}"
\ No newline at end of file
+        return f"LLMAPIError: {self.message}"
+
+
+class PermanentLLMError(LLMAPIError):
+    """
+    API error that retrying won't fix (e.g. a malformed response).
+
+    """
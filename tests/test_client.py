@@ -13,7 +13,7 @@ import pytest
 import json
 from unittest.mock import Mock, patch, call
 from smart_qa.client import LLMClient
-from smart_qa.custom_exceptions import LLMAPIError
+from smart_qa.custom_exceptions import LLMAPIError, PermanentLLMError
 
 
 class TestInitialization:
@@ -23,7 +23,11 @@ class TestInitialization:
         """Test that client initializes with mocked API."""
         assert client is not None
         assert client.model is not None
-        assert client.cache == {}
+        assert client.cache is None  # loaded lazily on first call
+    
+    def test_model_constructed_once(self, client, mock_genai):
+        """Test that the model is built a single time with the configured name."""
+        mock_genai.GenerativeModel.assert_called_once_with("gemini-2.5-flash")
     
     def test_client_fails_without_api_key(self, monkeypatch):
         """Test that client raises error when API key is missing."""
@@ -33,6 +37,16 @@ class TestInitialization:
         with pytest.raises(ValueError, match="GOOGLE_API_KEY not found"):
             LLMClient()
     
+    def test_dotenv_loaded_once_per_process(self, mock_genai, tmp_path, monkeypatch):
+        """Test that repeated client construction doesn't re-read .env."""
+        monkeypatch.setattr('smart_qa.client._DOTENV_LOADED', False)
+        
+        with patch('dotenv.load_dotenv') as mock_load:
+            LLMClient(cache_dir=str(tmp_path / "a"))
+            LLMClient(cache_dir=str(tmp_path / "b"))
+        
+        mock_load.assert_called_once()
+    
     def test_cache_directory_created(self, client):
         """Test that cache directory is created."""
         assert client.cache_dir.exists()
@@ -84,6 +98,17 @@ class TestCaching:
         assert result1 == result2
         assert mock_model.generate_content.call_count == 1
     
+    def test_ask_sends_context_and_question(self, client):
+        """Test that the ask prompt is filled in, even when context has braces."""
+        mock_model = client.model
+        mock_model.generate_content.return_value.text = "Blue"
+        
+        client.ask("Config: {color: blue}", "What color?")
+        
+        prompt = mock_model.generate_content.call_args.args[0][0]
+        assert "Config: {color: blue}" in prompt
+        assert "Question: What color?" in prompt
+    
     def test_different_inputs_not_cached(self, client, mock_genai):
         """Test that different inputs trigger new API calls."""
         mock_model = mock_genai.GenerativeModel.return_value
@@ -95,6 +120,51 @@ class TestCaching:
         # Should call API twice (different inputs)
         assert mock_model.generate_content.call_count == 2
     
+    def test_cache_key_separates_arguments(self, client):
+        """Test that argument boundaries are part of the cache key."""
+        assert client._get_cache_key("ask", "ab", "c") != client._get_cache_key("ask", "a", "bc")
+        assert client._get_cache_key("ask", "a", "b") == client._get_cache_key("ask", "a", "b")
+    
+    def test_repeat_call_skips_key_hashing(self, client):
+        """Test that in-process repeat calls are served without rehashing."""
+        client.model.generate_content.return_value.text = "Summary"
+        client.summarize("Some text")
+        
+        with patch.object(client, '_get_cache_key') as mock_key:
+            assert client.summarize("Some text") == "Summary"
+        
+        mock_key.assert_not_called()
+    
+    def test_cached_call_with_non_string_args(self, client):
+        """Test that unhashable args skip the memo but are still cached."""
+        func = Mock(return_value="Result")
+        
+        assert client._cached_call("custom", func, {"a": 1}) == "Result"
+        assert client._cached_call("custom", func, {"a": 1}) == "Result"
+        
+        assert func.call_count == 1
+        assert client._mem_cache == {}
+    
+    def test_clear_cache_resets_in_memory_memo(self, client):
+        """Test that clearing the cache also forgets in-process results."""
+        mock_model = client.model
+        mock_model.generate_content.return_value.text = "Summary"
+        
+        client.summarize("Some text")
+        client.clear_cache()
+        client.summarize("Some text")
+        
+        assert mock_model.generate_content.call_count == 2
+    
+    def test_cache_key_non_string_args_independent_of_orjson(self, client, monkeypatch):
+        """Test that non-string keys are the same with or without orjson."""
+        args = ({1: "a"}, 1e-5, 2 ** 70)
+        with_orjson = client._get_cache_key("custom", *args)
+        
+        monkeypatch.setattr('smart_qa.client.orjson', None)
+        
+        assert client._get_cache_key("custom", *args) == with_orjson
+    
     def test_cache_persists_to_disk(self, client, tmp_path):
         """Test that cache is saved to disk."""
         mock_model = client.model
@@ -103,39 +173,81 @@ class TestCaching:
         client.summarize("Test")
         
         # Verify cache file was created
-        cache_file = tmp_path / ".cache" / "llm_cache.json"
+        cache_file = tmp_path / ".cache" / "llm_cache.jsonl"
         assert cache_file.exists()
         
-        # Verify cache content
+        # Verify cache content (one JSON object per line)
         with open(cache_file, 'r') as f:
-            cache_data = json.load(f)
+            lines = f.read().splitlines()
+        
+        assert len(lines) == 1
+        assert json.loads(lines[0]) == client.cache
+    
+    def test_cache_miss_appends_to_disk(self, client):
+        """Test that each miss appends one line instead of rewriting the file."""
+        client.model.generate_content.return_value.text = "Result"
+        
+        client.summarize("First text")
+        client.summarize("Second text")
+        client.summarize("First text")  # HIT - nothing written
+        
+        with open(client.cache_file, 'r') as f:
+            lines = f.read().splitlines()
         
-        assert len(cache_data) > 0
+        assert len(lines) == 2
     
     def test_cache_loads_from_disk(self, tmp_path, mock_genai):
         """Test that cache is loaded from disk on init."""
         cache_dir = tmp_path / ".cache"
         cache_dir.mkdir()
-        cache_file = cache_dir / "llm_cache.json"
+        cache_file = cache_dir / "llm_cache.jsonl"
         
         # Pre-populate cache file
-        existing_cache = {
-            "test_key": "test_value"
-        }
         with open(cache_file, 'w') as f:
-            json.dump(existing_cache, f)
+            f.write(json.dumps({"test_key": "test_value"}) + "\n")
         
-        # Create new client (should load existing cache)
+        # Create new client (should load existing cache on first call)
         client = LLMClient(cache_dir=str(cache_dir))
+        assert client.cache is None
+        
+        client._cached_call("summarize", lambda t: "Summary", "Test")
         
         assert "test_key" in client.cache
         assert client.cache["test_key"] == "test_value"
     
+    def test_cache_hit_from_disk_skips_api(self, client, mock_genai):
+        """Test that a result persisted by one client is reused by the next."""
+        mock_model = mock_genai.GenerativeModel.return_value
+        mock_model.generate_content.return_value.text = "Persisted summary"
+        client.summarize("Test")
+        
+        new_client = LLMClient(cache_dir=str(client.cache_dir))
+        
+        assert new_client.summarize("Test") == "Persisted summary"
+        assert mock_model.generate_content.call_count == 1
+    
+    def test_cache_load_skips_truncated_line(self, tmp_path, mock_genai):
+        """Test that a partially written last line is ignored and compacted away."""
+        cache_dir = tmp_path / ".cache"
+        cache_dir.mkdir()
+        cache_file = cache_dir / "llm_cache.jsonl"
+        
+        with open(cache_file, 'w') as f:
+            f.write(json.dumps({"key1": "value1"}) + "\n")
+            f.write('{"key2": "val')  # crash mid-write
+        
+        client = LLMClient(cache_dir=str(cache_dir))
+        client._load_cache()
+        
+        assert client.cache == {"key1": "value1"}
+        with open(cache_file, 'r') as f:
+            lines = f.read().splitlines()
+        assert [json.loads(line) for line in lines] == [{"key1": "value1"}]
+    
     def test_clear_cache_removes_all_entries(self, client):
         """Test that clear_cache() removes all cached data."""
         # Add some cache entries
-        client.cache["key1"] = "value1"
-        client.cache["key2"] = "value2"
+        client.cache = {"key1": "value1", "key2": "value2"}
         client._save_cache()
         
         # Clear cache
@@ -146,8 +258,10 @@ class TestCaching:
         
         # Verify cache file reflects the change
         with open(client.cache_file, 'r') as f:
-            cache_data = json.load(f)
-        assert cache_data == {}
+            assert f.read() == ""
+        
+        # Rewrite goes through a temp file that is renamed into place
+        assert list(client.cache_dir.iterdir()) == [client.cache_file]
 
 
 class TestErrorHandling:
@@ -219,6 +333,31 @@ class TestRetryLogic:
         
         # Should have tried 3 times (default max_retries)
         assert mock_model.generate_content.call_count == 3
+    
+    def test_invalid_response_not_retried(self, client):
+        """Test that a malformed response fails immediately without retrying."""
+        mock_model = client.model
+        mock_model.generate_content.return_value = Mock(spec=[])  # no .text
+        
+        with patch('smart_qa.client.time.sleep') as mock_sleep:
+            with pytest.raises(PermanentLLMError, match="Empty or invalid response"):
+                client.summarize("Test")
+        
+        assert mock_model.generate_content.call_count == 1
+        mock_sleep.assert_not_called()
+    
+    def test_backoff_is_capped(self, client):
+        """Test that the wait between retries never exceeds the cap plus jitter."""
+        mock_model = client.model
+        mock_model.generate_content.side_effect = Exception("Persistent failure")
+        
+        with patch('smart_qa.client.time.sleep') as mock_sleep:
+            with pytest.raises(LLMAPIError):
+                client._call_api_with_retry("prompt", max_retries=6)
+        
+        waits = [c.args[0] for c in mock_sleep.call_args_list]
+        assert len(waits) == 5
+        assert all(w <= 10.5 for w in waits)
 
 
 class TestEntityExtraction:
@@ -263,6 +402,18 @@ class TestEntityExtraction:
         
         assert result == mock_response
     
+    def test_parse_json_handles_fence_variants(self, client):
+        """Test fences with leading whitespace, no language tag, or tildes."""
+        expected = {"people": ["Alice"]}
+        body = json.dumps(expected)
+        
+        assert client._parse_json_safely(f"  \n```json\n{body}\n```\n") == expected
+        assert client._parse_json_safely(f"```\n{body}\n```") == expected
+        assert client._parse_json_safely(f"~~~json\n{body}\n~~~") == expected
+        assert client._parse_json_safely(f"  {body}  ") == expected
+        assert client._parse_json_safely(f"```json\n{body}") == expected  # no closing fence
+        assert client._parse_json_safely(f"```json\n{body}\n") == expected
+    
     def test_extract_entities_raises_on_invalid_json(self, client):
         """Test that invalid JSON raises LLMAPIError."""
         mock_model = client.model
@@ -271,6 +422,40 @@ class TestEntityExtraction:
         with pytest.raises(LLMAPIError, match="Failed to parse JSON"):
             client.extract_entities("Test text")
     
+    def test_extract_entities_cache_hit_skips_parsing(self, client):
+        """Test that the parsed dict is cached, so HITs don't re-parse JSON."""
+        mock_model = client.model
+        mock_model.generate_content.return_value.text = json.dumps({"people": ["Ada"]})
+        
+        client.extract_entities("Test text")
+        
+        with patch.object(client, '_parse_json_safely') as mock_parse:
+            result = client.extract_entities("Test text")
+        
+        assert result == {"people": ["Ada"]}
+        mock_parse.assert_not_called()
+        assert mock_model.generate_content.call_count == 1
+    
+    def test_extract_entities_result_is_independent_copy(self, client):
+        """Test that mutating a returned dict doesn't change later results."""
+        mock_model = client.model
+        mock_model.generate_content.return_value.text = json.dumps({"people": ["Ada"]})
+        
+        first = client.extract_entities("Test text")
+        first["people"].append("MUTATED")
+        
+        assert client.extract_entities("Test text") == {"people": ["Ada"]}
+    
+    def test_extract_entities_does_not_cache_invalid_json(self, client):
+        """Test that an unparseable response is not stored in the cache."""
+        mock_model = client.model
+        mock_model.generate_content.return_value.text = "This is not JSON"
+        
+        with pytest.raises(LLMAPIError):
+            client.extract_entities("Test text")
+        
+        assert client.cache == {}
+    
     def test_extract_entities_rejects_empty_text(self, client):
         """Test that empty input is rejected."""
         with pytest.raises(ValueError, match="Text cannot be empty"):
@@ -0,0 +1,69 @@
+"""
+Tests for the command-line interface in main.py.
+
+"""
+
+import pytest
+from unittest.mock import patch
+from main import main
+
+
+class TestClearCache:
+    """Test the --clear-cache fast path."""
+    
+    def test_clear_cache_without_command_or_api_key(self, tmp_path, monkeypatch):
+        """Test that --clear-cache alone truncates the cache without needing a key."""
+        monkeypatch.delenv("GOOGLE_API_KEY", raising=False)
+        monkeypatch.chdir(tmp_path)
+        monkeypatch.setattr('sys.argv', ['main.py', '--clear-cache'])
+        
+        cache_file = tmp_path / ".cache" / "llm_cache.jsonl"
+        cache_file.parent.mkdir()
+        cache_file.write_text('{"summarize:abc":"cached"}\n')
+        
+        with pytest.raises(SystemExit) as exc_info:
+            main()
+        
+        assert exc_info.value.code == 0
+        assert cache_file.read_text() == ""
+
+
+class TestArgumentParsing:
+    """Test that parsers are built for the command being run."""
+    
+    def test_ask_parses_question(self, monkeypatch):
+        """Test that 'ask --question' reaches the ask handler."""
+        monkeypatch.setattr('sys.argv', ['main.py', 'ask', '--question', 'x'])
+        
+        with patch('smart_qa.client.LLMClient'), patch('main.handle_ask') as mock_handle:
+            main()
+        
+        args = mock_handle.call_args.args[0]
+        assert args.command == 'ask'
+        assert args.question == 'x'
+        assert args.file is None
+    
+    def test_top_level_help_lists_all_commands(self, monkeypatch, capsys):
+        """Test that --help still lists commands whose parsers weren't built."""
+        monkeypatch.setattr('sys.argv', ['main.py', '--help'])
+        
+        with pytest.raises(SystemExit) as exc_info:
+            main()
+        
+        assert exc_info.value.code == 0
+        output = capsys.readouterr().out
+        for command in ('summarize', 'ask', 'extract'):
+            assert command in output
+    
+    def test_subcommand_help_shows_its_options(self, monkeypatch, capsys):
+        """Test that a command's own --help shows its arguments."""
+        monkeypatch.setattr('sys.argv', ['main.py', 'ask', '--help'])
+        
+        with pytest.raises(SystemExit) as exc_info:
+            main()
+        
+        assert exc_info.value.code == 0
+        output = capsys.readouterr().out
+        assert '--file' in output
+        assert '--question' in output
+        assert '--save' in output